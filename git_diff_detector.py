@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
 
+import atexit
+import functools
+import importlib
+import io
+import os
+import re
 import subprocess
 import sys
-import json
-from typing import List, Dict, Optional, Set, Tuple
+import threading
+from types import ModuleType
+from typing import BinaryIO, Callable, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+# json, tomllib, ijson and concurrent.futures are imported where they are
+# used, so runs that never need them (e.g. no manifest changes) skip the cost
 
 # Define manifest file patterns for different languages
 MANIFEST_PATTERNS = {
@@ -20,6 +30,51 @@ MANIFEST_PATTERNS = {
     'rust': ['Cargo.toml', 'Cargo.lock']
 }
 
+# Language names. get_language_for_file always returns one of these objects
+# (the MANIFEST_PATTERNS keys), never a new string.
+LANGS = tuple(MANIFEST_PATTERNS.keys())
+
+# Manifest base names mapped to their language, so most files are classified
+# with a single dict lookup. Languages are walked in reverse so that, for names
+# shared by several languages (e.g. pom.xml), the first one listed wins.
+BASENAME_TO_LANG = {
+    pattern: lang
+    for lang, patterns in reversed(MANIFEST_PATTERNS.items())
+    for pattern in patterns
+}
+
+# All patterns as one tuple, so a suffix check runs inside str.endswith
+ALL_PATTERNS = tuple(pattern for patterns in MANIFEST_PATTERNS.values() for pattern in patterns)
+
+# Git pathspecs matching the same names as ALL_PATTERNS anywhere in the
+# repository, so git leaves non-manifest files out of the diff output
+MANIFEST_PATHSPECS = tuple(f":(top,glob)**/*{pattern}" for pattern in dict.fromkeys(ALL_PATTERNS))
+
+# Requirement specifiers: the package name ends at the first version
+# specifier, extra, environment marker, URL or whitespace. In requirements.txt,
+# comments, pip options such as -r/-e and direct URLs don't name a package
+# and are skipped.
+_REQ_SPLIT = re.compile(r"[<>=!~;@(\[\s]")
+_REQ_SKIP = re.compile(r"#|-|[\w.+-]+://")
+
+# Top-level JSON keys whose entries are named after dependencies
+JSON_DEP_KEYS = ('dependencies', 'devDependencies', 'require', 'require-dev')
+
+class ChangedFile(NamedTuple):
+    """A manifest file changed between the base and target branches."""
+    filename: str
+    status: str
+    language: str
+    old_filename: Optional[str] = None
+
+class DepChange(NamedTuple):
+    """Dependencies added and removed in a manifest file, sorted by name."""
+    filename: str
+    status: str
+    new_deps: Tuple[str, ...]
+    removed_deps: Tuple[str, ...]
+    old_filename: Optional[str] = None
+
 def get_current_branch() -> str:
     try:
         result = subprocess.run(
@@ -32,21 +87,50 @@ def get_current_branch() -> str:
     except subprocess.CalledProcessError:
         return "unknown"
 
-def is_manifest_file(filename: str) -> bool:
+def iter_nul_fields(stream: BinaryIO) -> Iterator[bytes]:
     """
-    Check if a file is a dependency manifest file.
+    Yield NUL-terminated fields from a binary stream as they are read.
 
     Args:
-        filename: Name of the file to check
+        stream: Binary stream producing NUL-terminated records
+
+    Yields:
+        Each field, without its terminator
+    """
+    pending = b""
+    while True:
+        chunk = stream.read1(65536)
+        if not chunk:
+            break
+        fields = (pending + chunk).split(b"\0")
+        pending = fields.pop()
+        yield from fields
+
+def build_suffix_classifier() -> Callable[[str], Optional[str]]:
+    """
+    Generate a function returning the language of the pattern a filename ends with.
+
+    MANIFEST_PATTERNS is constant, so the checks are unrolled into a chain of
+    `if filename.endswith(...)` statements at import time. They follow
+    MANIFEST_PATTERNS order, which lists the most common ecosystems first
+    and makes the first language win for shared names.
 
     Returns:
-        True if the file is a manifest file, False otherwise
+        The generated function
     """
-    return any(
-        filename.endswith(pattern)
-        for patterns in MANIFEST_PATTERNS.values()
-        for pattern in patterns
-    )
+    lines = ["def classify_suffix(filename):"]
+    seen = set()
+    for index, lang in enumerate(LANGS):
+        for pattern in MANIFEST_PATTERNS[lang]:
+            if pattern not in seen:
+                seen.add(pattern)
+                lines.append(f"    if filename.endswith({pattern!r}): return LANGS[{index}]")
+    lines.append("    return None")
+    namespace = {"LANGS": LANGS}
+    exec("\n".join(lines), namespace)
+    return namespace["classify_suffix"]
+
+classify_suffix = build_suffix_classifier()
 
 def get_language_for_file(filename: str) -> Optional[str]:
     """
@@ -56,146 +140,485 @@ def get_language_for_file(filename: str) -> Optional[str]:
         filename: Name of the manifest file
 
     Returns:
-        Language name if found, None otherwise
+        Language name if the file is a manifest file, None otherwise
     """
-    for lang, patterns in MANIFEST_PATTERNS.items():
-        if any(filename.endswith(pattern) for pattern in patterns):
-            return lang
-    return None
+    lang = BASENAME_TO_LANG.get(os.path.basename(filename))
+    if lang is not None or not filename.endswith(ALL_PATTERNS):
+        return lang
+    # Names that only end with a pattern, e.g. dev-requirements.txt or app.csproj
+    return classify_suffix(filename)
 
-def get_file_content(filename: str, branch: str) -> Optional[str]:
-    try:
+class GitCatFile:
+    """
+    Long-running `git cat-file --batch` process used to read file contents.
+
+    A single process serves every lookup, so reading N manifests costs one
+    spawn instead of one `git show` per file and revision. Requests are
+    serialized with a lock so the process can be shared between threads.
+    """
+
+    def __init__(self):
+        self.process = self._start()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _start() -> subprocess.Popen:
+        return subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+
+    def read_blob(self, rev: str, path: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Read the contents of a file at a given revision.
+
+        Args:
+            rev: Branch, tag or commit to read from
+            path: Path of the file relative to the repository root
+
+        Returns:
+            The blob SHA and raw file contents, or None if the file does not
+            exist at that revision
+        """
+        return self.read_blobs([(rev, path)])[0]
+
+    def read_blobs(self, requests: List[Tuple[str, str]]) -> List[Optional[Tuple[str, bytes]]]:
+        """
+        Read several files in one round trip.
+
+        All requests are written before any response is read, so git can
+        answer them back to back. Meant for a handful of requests at a time.
+
+        Args:
+            requests: (rev, path) pairs to read
+
+        Returns:
+            A (sha, contents) pair or None for each request, in order
+        """
+        names = [self._object_name(rev, path) for rev, path in requests]
+        pending = [name for name in names if name is not None]
+        with self.lock:
+            try:
+                self.process.stdin.write(b"".join(name + b"\n" for name in pending))
+                self.process.stdin.flush()
+                responses = iter([self._read_response() for _ in pending])
+            except (OSError, ValueError):
+                # Responses may be left unread in the pipe, which would hand
+                # them to the next caller, so start over with a new process
+                self._restart()
+                return [None] * len(requests)
+        return [None if name is None else next(responses) for name in names]
+
+    @staticmethod
+    def _object_name(rev: str, path: str) -> Optional[bytes]:
+        """
+        Get the name to send to cat-file for a file at a given revision.
+
+        Requests are newline-terminated, so a path containing a newline would
+        be read as several requests. Such paths are resolved to their object
+        id with a separate `git rev-parse` first.
+
+        Args:
+            rev: Branch, tag or commit to read from
+            path: Path of the file relative to the repository root
+
+        Returns:
+            The object name, or None if the file does not exist at that revision
+        """
+        if "\n" not in path and "\r" not in path:
+            return os.fsencode(f"{rev}:{path}")
         result = subprocess.run(
-            ["git", "show", f"{branch}:{filename}"],
-            capture_output=True,
-            text=True,
-            check=True
+            ["git", "rev-parse", "--verify", "--quiet", f"{rev}:{path}"],
+            capture_output=True
         )
-        return result.stdout
-    except subprocess.CalledProcessError:
+        if result.returncode != 0:
+            return None
+        return result.stdout.strip()
+
+    def _read_response(self) -> Optional[Tuple[str, bytes]]:
+        # Header is "<sha> <type> <size>\n", or "<object> missing\n" /
+        # "<object> ambiguous\n", where <object> may itself contain spaces
+        header = self.process.stdout.readline()
+        if header.endswith((b" missing\n", b" ambiguous\n")):
+            return None
+        parts = header.rstrip(b"\n").rsplit(b" ", 2)
+        if len(parts) != 3 or not parts[2].isdigit():
+            raise ValueError(f"unexpected git cat-file response: {header!r}")
+        sha, kind, size = parts
+        # The body is followed by a trailing newline
+        data = self.process.stdout.read(int(size) + 1)[:-1]
+        if kind != b"blob":
+            return None
+        return sha.decode(), data
+
+    def _restart(self):
+        self.process.kill()
+        self.close()
+        self.process = self._start()
+
+    def close(self):
+        if self.process.stdin and not self.process.stdin.closed:
+            self.process.stdin.close()
+        self.process.wait()
+        if self.process.stdout and not self.process.stdout.closed:
+            self.process.stdout.close()
+
+_cat_file: Optional[GitCatFile] = None
+_cat_file_lock = threading.Lock()
+
+def get_cat_file() -> GitCatFile:
+    global _cat_file
+    with _cat_file_lock:
+        if _cat_file is None:
+            _cat_file = GitCatFile()
+            atexit.register(_cat_file.close)
+    return _cat_file
+
+def get_file_contents(files: List[Tuple[str, str]]) -> List[Tuple[Optional[str], Optional[bytes]]]:
+    """
+    Read several files from git in a single round trip.
+
+    Contents are returned as raw bytes; parsers that need text decode
+    them, so JSON can be streamed without an extra copy.
+
+    Args:
+        files: (filename, branch) pairs to read
+
+    Returns:
+        A (sha, content) pair for each file, (None, None) for missing files
+    """
+    blobs = get_cat_file().read_blobs([(branch, filename) for filename, branch in files])
+    return [(None, None) if blob is None else blob for blob in blobs]
+
+def get_file_content(filename: str, branch: str) -> Tuple[Optional[str], Optional[bytes]]:
+    return get_file_contents([(filename, branch)])[0]
+
+# Parsed dependencies keyed by (blob SHA, parser), so identical contents are
+# parsed once per run
+_deps_cache: Dict[Tuple[str, Callable[[bytes], Set[str]]], FrozenSet[str]] = {}
+
+def parse_blob_dependencies(filename: str, sha: Optional[str], content: Optional[bytes]) -> FrozenSet[str]:
+    """
+    Parse the dependencies of a blob, reusing earlier results for the same SHA.
+
+    Args:
+        filename: Path of the manifest file, used to pick the parser
+        sha: Blob SHA, or None if the file does not exist
+        content: Contents of the blob
+
+    Returns:
+        The dependency names, empty if the file does not exist
+    """
+    parser = get_parser(filename)
+    if sha is None or parser is None:
+        return frozenset()
+    key = (sha, parser)
+    deps = _deps_cache.get(key)
+    if deps is None:
+        deps = _deps_cache[key] = frozenset(parse_dependencies(filename, content))
+    return deps
+
+def get_dependencies(filename: str, branch: str) -> FrozenSet[str]:
+    """
+    Get the dependencies declared by a manifest file at a given revision.
+
+    Args:
+        filename: Path of the manifest file
+        branch: Branch, tag or commit to read from
+
+    Returns:
+        The dependency names, empty if the file does not exist at that revision
+    """
+    sha, content = get_file_content(filename, branch)
+    return parse_blob_dependencies(filename, sha, content)
+
+def get_dependency_changes(
+    old_filename: str,
+    filename: str,
+    base_branch: str,
+    target_branch: str
+) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    Compare the dependencies of a manifest file between two revisions.
+
+    Both sides are read in one round trip. When the blobs are identical and
+    use the same parser nothing is parsed, as the result is known to be empty.
+
+    Args:
+        old_filename: Path of the file in the base branch
+        filename: Path of the file in the target branch
+        base_branch: Branch to compare against
+        target_branch: Branch being analyzed
+
+    Returns:
+        The added and the removed dependency names
+    """
+    (base_sha, base_content), (target_sha, target_content) = get_file_contents([
+        (old_filename, base_branch),
+        (filename, target_branch)
+    ])
+    if base_sha == target_sha and get_parser(old_filename) is get_parser(filename):
+        return frozenset(), frozenset()
+    base_deps = parse_blob_dependencies(old_filename, base_sha, base_content)
+    target_deps = parse_blob_dependencies(filename, target_sha, target_content)
+    return target_deps - base_deps, base_deps - target_deps
+
+def lockfile_package_name(path: str) -> str:
+    """
+    Get the package name from a package-lock.json "packages" entry.
+
+    Args:
+        path: Install path of the package, e.g. "node_modules/a/node_modules/@scope/b"
+
+    Returns:
+        The package name, e.g. "@scope/b"
+    """
+    return path.rpartition('node_modules/')[2]
+
+@functools.lru_cache(maxsize=None)
+def optional_import(name: str) -> Optional[ModuleType]:
+    """
+    Import an optional module on first use.
+
+    Args:
+        name: Name of the module
+
+    Returns:
+        The module, or None if it is not installed
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
         return None
 
-def parse_dependencies(filename: str, content: str) -> Set[str]:
-    if not content:
+def requirement_name(spec: str) -> str:
+    """
+    Get the package name from a requirement specifier such as "requests>=2.0".
+
+    Args:
+        spec: PEP 508 style requirement
+
+    Returns:
+        The package name, empty if there is none
+    """
+    return _REQ_SPLIT.split(spec.strip(), 1)[0]
+
+def parse_json_dependencies(content: bytes) -> Set[str]:
+    deps = set()
+    ijson = optional_import('ijson')
+    if ijson is not None:
+        # Stream the document and keep only the keys of the dependency
+        # maps instead of building the whole parse tree
+        for prefix, event, value in ijson.parse(io.BytesIO(content)):
+            if event != 'map_key':
+                continue
+            if prefix in JSON_DEP_KEYS:
+                deps.add(value)
+            elif prefix == 'packages' and 'node_modules/' in value:
+                deps.add(lockfile_package_name(value))
+        return deps
+    import json
+    data = json.loads(content)
+    for key in JSON_DEP_KEYS:
+        section = data.get(key)
+        # Only maps are keyed by dependency name, matching the ijson path
+        if isinstance(section, dict):
+            deps.update(section)
+    if isinstance(data.get('packages'), dict):
+        deps.update(
+            lockfile_package_name(path)
+            for path in data['packages']
+            if 'node_modules/' in path
+        )
+    return deps
+
+def parse_requirements(content: bytes) -> Set[str]:
+    deps = set()
+    # Iterate lazily rather than building a list of every line
+    for line in io.StringIO(content.decode("utf-8", errors="replace")):
+        line = line.strip()
+        if line and not _REQ_SKIP.match(line):
+            package = requirement_name(line)
+            if package:
+                deps.add(package)
+    return deps
+
+def toml_table(data: dict, key: str) -> dict:
+    # Values of an unexpected type are treated as missing
+    value = data.get(key)
+    return value if isinstance(value, dict) else {}
+
+def toml_array(data: dict, key: str) -> list:
+    value = data.get(key)
+    return list(value) if isinstance(value, list) else []
+
+def parse_toml_dependencies(content: bytes) -> Set[str]:
+    """
+    Parse the dependency tables of pyproject.toml, Pipfile and Cargo.toml.
+
+    Args:
+        content: UTF-8 encoded TOML document
+
+    Returns:
+        The dependency names, empty if tomllib (Python 3.11+) is unavailable
+    """
+    tomllib = optional_import('tomllib')
+    if tomllib is None:
+        return set()
+    data = tomllib.loads(content.decode("utf-8", errors="replace"))
+    deps = set()
+    # PEP 621 lists requirement specifiers
+    project = toml_table(data, 'project')
+    specs = toml_array(project, 'dependencies')
+    for group in toml_table(project, 'optional-dependencies').values():
+        if isinstance(group, list):
+            specs.extend(group)
+    deps.update(requirement_name(spec) for spec in specs if isinstance(spec, str))
+    # Poetry, Pipfile and Cargo use tables keyed by package name
+    poetry = toml_table(toml_table(data, 'tool'), 'poetry')
+    tables = [
+        toml_table(poetry, 'dependencies'),
+        toml_table(poetry, 'dev-dependencies'),
+        toml_table(data, 'packages'),
+        toml_table(data, 'dev-packages'),
+        toml_table(data, 'dependencies'),
+        toml_table(data, 'dev-dependencies'),
+        toml_table(data, 'build-dependencies')
+    ]
+    groups = toml_table(poetry, 'group')
+    tables.extend(toml_table(toml_table(groups, group), 'dependencies') for group in groups)
+    for table in tables:
+        deps.update(table)
+    # Poetry lists the Python version among its dependencies
+    deps.discard('python')
+    deps.discard('')
+    return deps
+
+# Parsers by file extension, with base names that have no extension listed
+# separately, so picking a parser is a dict lookup
+PARSERS_BY_EXT = {
+    '.json': parse_json_dependencies,
+    '.txt': parse_requirements,
+    '.toml': parse_toml_dependencies
+}
+PARSERS_BY_NAME = {
+    'Pipfile': parse_toml_dependencies
+}
+
+def get_parser(filename: str) -> Optional[Callable[[bytes], Set[str]]]:
+    parser = PARSERS_BY_NAME.get(os.path.basename(filename))
+    if parser is None:
+        parser = PARSERS_BY_EXT.get(os.path.splitext(filename)[1])
+    return parser
+
+def parse_dependencies(filename: str, content: bytes) -> Set[str]:
+    parser = get_parser(filename)
+    if not content or parser is None:
         return set()
     try:
-        if filename.endswith('.json'):
-            data = json.loads(content)
-            deps = set()
-            if 'dependencies' in data:
-                deps.update(data['dependencies'].keys())
-            if 'devDependencies' in data:
-                deps.update(data['devDependencies'].keys())
-            if 'require' in data:
-                deps.update(data['require'].keys())
-            if 'require-dev' in data:
-                deps.update(data['require-dev'].keys())
-            return deps
-        elif filename.endswith('.txt'):
-            deps = set()
-            for line in content.split('\n'):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    package = line.split('==')[0].split('>=')[0].split('<=')[0].split('>')[0].split('<')[0].strip()
-                    if package:
-                        deps.add(package)
-            return deps
+        return parser(content)
     except Exception as e:
         print(f"Error parsing {filename}: {e}", file=sys.stderr)
     return set()
 
-def get_git_diff(base_branch: str, target_branch: str) -> List[Dict[str, str]]:
-    try:
-        # Compare base_branch..target_branch to get what is new in target_branch
-        result = subprocess.run(
-            ["git", "diff", "--name-status", f"{base_branch}..{target_branch}"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        changed_files = []
-        for line in result.stdout.strip().split("\n"):
-            if not line:
-                continue
-            parts = line.split("\t")
-            status = parts[0]
-            if status.startswith('R'):
-                old_filename = parts[1]
-                new_filename = parts[2]
-                if is_manifest_file(old_filename) or is_manifest_file(new_filename):
-                    changed_files.append({
-                        "filename": new_filename,
-                        "status": "R",
-                        "language": get_language_for_file(new_filename),
-                        "old_filename": old_filename
-                    })
+def git_has_changes(base_branch: str, target_branch: str, pathspecs: Tuple[str, ...]) -> bool:
+    """
+    Check whether any file matching the pathspecs changed between two branches.
+
+    `git diff --quiet` only reports through its exit status, so this is much
+    cheaper than listing the changes.
+
+    Args:
+        base_branch: Branch to compare against
+        target_branch: Branch being analyzed
+        pathspecs: Git pathspecs limiting the comparison
+
+    Returns:
+        True if there are changes. Errors count as changes, so that
+        get_git_diff reports them.
+    """
+    result = subprocess.run(
+        ["git", "diff", "--quiet", f"{base_branch}..{target_branch}", "--", *pathspecs],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    return result.returncode != 0
+
+def get_git_diff(base_branch: str, target_branch: str) -> List[ChangedFile]:
+    # Compare base_branch..target_branch to get what is new in target_branch
+    revision_range = f"{base_branch}..{target_branch}"
+    cmd = ["git", "diff", "-z", "--name-status", revision_range, "--", *MANIFEST_PATHSPECS]
+    changed_files = []
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as process:
+        # Records are "<status>\0<path>\0", with a second path for renames and copies
+        fields = iter_nul_fields(process.stdout)
+        for status in fields:
+            status = status.decode()
+            if status.startswith(('R', 'C')):
+                old_filename = os.fsdecode(next(fields))
+                new_filename = os.fsdecode(next(fields))
+                if status.startswith('C'):
+                    # A copy leaves the source untouched, so only the new file counts, as added
+                    language = get_language_for_file(new_filename)
+                    if language is not None:
+                        changed_files.append(ChangedFile(new_filename, "A", language))
+                    continue
+                language = get_language_for_file(new_filename) or get_language_for_file(old_filename)
+                if language is not None:
+                    changed_files.append(ChangedFile(new_filename, "R", language, old_filename))
             else:
-                filename = parts[1]
-                if is_manifest_file(filename):
-                    changed_files.append({
-                        "filename": filename,
-                        "status": status,
-                        "language": get_language_for_file(filename)
-                    })
-        return changed_files
-    except subprocess.CalledProcessError as e:
-        print(f"Error getting git diff: {e}", file=sys.stderr)
+                filename = os.fsdecode(next(fields))
+                language = get_language_for_file(filename)
+                if language is not None:
+                    changed_files.append(ChangedFile(filename, status, language))
+    if process.returncode != 0:
+        print(
+            f"Error getting git diff: 'git diff {revision_range}' returned non-zero exit status {process.returncode}.",
+            file=sys.stderr
+        )
         return []
+    return changed_files
+
+def analyze_file(file_info: ChangedFile, base_branch: str, target_branch: str) -> Optional[DepChange]:
+    # Dependency lists are sorted once here so the output code can use them as is
+    filename = file_info.filename
+    status = file_info.status
+    if status == "A":
+        deps = get_dependencies(filename, target_branch)
+        return DepChange(filename, status, tuple(sorted(deps)), ())
+    elif status == "D":
+        deps = get_dependencies(filename, base_branch)
+        return DepChange(filename, status, (), tuple(sorted(deps)))
+    elif status == "M":
+        new_deps, removed_deps = get_dependency_changes(filename, filename, base_branch, target_branch)
+        return DepChange(filename, status, tuple(sorted(new_deps)), tuple(sorted(removed_deps)))
+    elif status == "R":
+        old_filename = file_info.old_filename
+        new_deps, removed_deps = get_dependency_changes(old_filename, filename, base_branch, target_branch)
+        return DepChange(filename, status, tuple(sorted(new_deps)), tuple(sorted(removed_deps)), old_filename)
+    return None
 
-def analyze_dependencies(changed_files: List[Dict[str, str]], base_branch: str, target_branch: str) -> Dict[str, List[Dict[str, Set[str]]]]:
-    changes_by_language = {}
-    for file_info in changed_files:
-        lang = file_info["language"]
-        if lang not in changes_by_language:
-            changes_by_language[lang] = []
-        filename = file_info["filename"]
-        status = file_info["status"]
-        if status == "A":
-            content = get_file_content(filename, target_branch)
-            deps = parse_dependencies(filename, content)
-            changes_by_language[lang].append({
-                "filename": filename,
-                "status": status,
-                "new_deps": deps,
-                "removed_deps": set()
-            })
-        elif status == "D":
-            content = get_file_content(filename, base_branch)
-            deps = parse_dependencies(filename, content)
-            changes_by_language[lang].append({
-                "filename": filename,
-                "status": status,
-                "new_deps": set(),
-                "removed_deps": deps
-            })
-        elif status == "M":
-            base_content = get_file_content(filename, base_branch)
-            target_content = get_file_content(filename, target_branch)
-            base_deps = parse_dependencies(filename, base_content)
-            target_deps = parse_dependencies(filename, target_content)
-            new_deps = target_deps - base_deps
-            removed_deps = base_deps - target_deps
-            changes_by_language[lang].append({
-                "filename": filename,
-                "status": status,
-                "new_deps": new_deps,
-                "removed_deps": removed_deps
-            })
-        elif status == "R":
-            old_filename = file_info["old_filename"]
-            base_content = get_file_content(old_filename, base_branch)
-            target_content = get_file_content(filename, target_branch)
-            base_deps = parse_dependencies(old_filename, base_content)
-            target_deps = parse_dependencies(filename, target_content)
-            new_deps = target_deps - base_deps
-            removed_deps = base_deps - target_deps
-            changes_by_language[lang].append({
-                "filename": filename,
-                "status": status,
-                "old_filename": old_filename,
-                "new_deps": new_deps,
-                "removed_deps": removed_deps
-            })
+def analyze_dependencies(changed_files: List[ChangedFile], base_branch: str, target_branch: str) -> Dict[str, List[DepChange]]:
+    # One bucket per language up front; languages without changes stay empty
+    changes_by_language = {lang: [] for lang in LANGS}
+    analyze = functools.partial(analyze_file, base_branch=base_branch, target_branch=target_branch)
+    # Files are independent, so on multi-core machines git can serve one
+    # file's blobs while another is parsed. Parsing holds the GIL and blob
+    # reads share one cat-file pipe, so with a single file or a single CPU
+    # a pool is pure overhead (about 5 ms on a one-file diff); run serially
+    workers = min(8, os.cpu_count() or 1, len(changed_files))
+    if workers <= 1:
+        changes = list(map(analyze, changed_files))
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            changes = list(executor.map(analyze, changed_files))
+    # Results come back in diff order either way
+    for file_info, change in zip(changed_files, changes):
+        if change is not None:
+            changes_by_language[file_info.language].append(change)
     return changes_by_language
 
 def main():
@@ -208,55 +631,60 @@ def main():
     if len(args) == 0:
         print("Usage: script.py [target_branch] [base_branch] [--json]")
         sys.exit(1)
-    elif len(args) == 1:
-        target_branch = args[0]
+    target_branch = args[0]
+    if len(args) == 1:
+        # Compare against HEAD; the branch name is only needed for messages
+        base_rev = "HEAD"
         base_branch = get_current_branch()
     else:
-        target_branch = args[0]
-        base_branch = args[1]
-    changed_files = get_git_diff(base_branch, target_branch)
+        base_rev = base_branch = args[1]
+    has_changes = git_has_changes(base_rev, target_branch, MANIFEST_PATHSPECS)
+    changed_files = get_git_diff(base_rev, target_branch) if has_changes else []
     if not changed_files:
         print(f"No changes detected in dependency manifest files.")
         print(f"\nNote: Comparing '{target_branch}' against '{base_branch}'.")
         print("If you're not seeing expected changes, make sure your branch arguments are correct.")
         print("The script shows changes in the target branch compared to the base branch.")
         return
-    changes_by_language = analyze_dependencies(changed_files, base_branch, target_branch)
+    changes_by_language = analyze_dependencies(changed_files, base_rev, target_branch)
     if output_json:
+        import json
         result = {}
         for lang, files in changes_by_language.items():
             lang_dict = {}
             for file_info in files:
-                lang_dict[file_info["filename"]] = {
-                    "new_deps": sorted(file_info["new_deps"]),
-                    "removed_deps": sorted(file_info["removed_deps"])
+                lang_dict[file_info.filename] = {
+                    "new_deps": file_info.new_deps,
+                    "removed_deps": file_info.removed_deps
                 }
             if lang_dict:
                 result[lang] = lang_dict
         print(json.dumps(result, indent=2))
         return
-    print(f"Changes in dependency manifest files (comparing {target_branch} against {base_branch}):")
-    print("-" * 50)
+    # Build the whole report and write it once instead of printing line by line
+    out = [
+        f"Changes in dependency manifest files (comparing {target_branch} against {base_branch}):\n",
+        "-" * 50 + "\n"
+    ]
     for lang, files in sorted(changes_by_language.items()):
         if not files:
             continue
-        print(f"\n{lang.upper()}:")
+        out.append(f"\n{lang.upper()}:\n")
         for file_info in files:
-            status = file_info["status"]
-            filename = file_info["filename"]
+            status = file_info.status
+            filename = file_info.filename
             if status == "R":
-                old_filename = file_info["old_filename"]
-                print(f"  {status}\t{old_filename} -> {filename}")
+                old_filename = file_info.old_filename
+                out.append(f"  {status}\t{old_filename} -> {filename}\n")
             else:
-                print(f"  {status}\t{filename}")
-            if file_info["new_deps"]:
-                print("    New dependencies:")
-                for dep in sorted(file_info["new_deps"]):
-                    print(f"      + {dep}")
-            if file_info["removed_deps"]:
-                print("    Removed dependencies:")
-                for dep in sorted(file_info["removed_deps"]):
-                    print(f"      - {dep}")
+                out.append(f"  {status}\t{filename}\n")
+            if file_info.new_deps:
+                out.append("    New dependencies:\n")
+                out.extend(f"      + {dep}\n" for dep in file_info.new_deps)
+            if file_info.removed_deps:
+                out.append("    Removed dependencies:\n")
+                out.extend(f"      - {dep}\n" for dep in file_info.removed_deps)
+    sys.stdout.write("".join(out))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file